@@ -2,19 +2,54 @@
 from __future__ import annotations
 
 import os
+import re
+import math
 import time
 import random
+import queue
+import atexit
+import hashlib
+import asyncio
 import logging
-from typing import Dict, List, Optional, Tuple
-from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+import logging.handlers
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlparse, urlsplit, urlunparse, parse_qsl, urlencode
 
 import requests
+from requests.adapters import HTTPAdapter
 
 try:
     from dotenv import load_dotenv
 except Exception:
     load_dotenv = None
 
+try:
+    import httpx
+except Exception:
+    httpx = None
+
+try:
+    import orjson
+except Exception:
+    orjson = None
+
+try:
+    import tldextract
+except Exception:
+    tldextract = None
+
+try:
+    from diskcache import Cache
+except Exception:
+    Cache = None
+
+try:
+    import h2  # noqa: F401  (httpx butuh h2 untuk http2=True)
+    _HTTP2 = True
+except Exception:
+    _HTTP2 = False
+
 
 # -------- URL hygiene (normalize + domain-check + dedup) --------
 
@@ -23,8 +58,10 @@ TRACKING_KEYS = {
     "gclid", "fbclid", "yclid", "mc_cid", "mc_eid"
 }
 
+@lru_cache(maxsize=8192)
 def normalize_url(raw: str) -> str:
-    """Buang fragment #..., rapikan tracking params umum, dan normalisasi scheme+host."""
+    """Buang fragment #..., rapikan tracking params umum, dan normalisasi scheme+host.
+    Di-cache: URL yang sama sering muncul lagi di query lain untuk domain yang sama."""
     raw = (raw or "").strip()
     if not raw:
         return raw
@@ -32,35 +69,68 @@ def normalize_url(raw: str) -> str:
         u = urlparse(raw)
         # drop fragment
         fragment = ""
-        # clean tracking params
-        q = [(k, v) for (k, v) in parse_qsl(u.query, keep_blank_values=True) if k not in TRACKING_KEYS]
-        query = urlencode(q, doseq=True)
+        # clean tracking params (tanpa query string, skip parse_qsl sama sekali)
+        query = ""
+        if u.query:
+            q = [(k, v) for (k, v) in parse_qsl(u.query, keep_blank_values=True) if k not in TRACKING_KEYS]
+            query = urlencode(q, doseq=True)
         # normalize
         scheme = (u.scheme or "").lower()
         netloc = (u.netloc or "").lower()
         return urlunparse((scheme, netloc, u.path, u.params, query, fragment))
-    except Exception:
+    except ValueError:
         return raw
 
 
-def is_domain_scoped(url: str, domain: str) -> bool:
-    """Pastikan hasil benar-benar masih di domain target (host==domain atau subdomainnya)."""
+@lru_cache(maxsize=1)
+def _tld_extractor():
+    # suffix list di-cache di disk oleh tldextract, jadi cuma di-download sekali
+    return tldextract.TLDExtract(cache_dir=os.path.expanduser("~/.cache/dork-tld"))
+
+
+@lru_cache(maxsize=4096)
+def registered_domain(host: str) -> str:
+    """'www.example.co.uk' -> 'example.co.uk' (pakai public suffix list). Tanpa tldextract: host apa adanya."""
+    host = (host or "").strip().lower()
+    if tldextract is None or not host:
+        return host
+    e = _tld_extractor()(host)
+    return f"{e.domain}.{e.suffix}" if e.domain and e.suffix else host
+
+
+def is_domain_scoped(url: str, domain: str, same_site: bool = False) -> bool:
+    """Pastikan hasil benar-benar masih di domain target (host==domain atau subdomainnya).
+    Host = netloc dari urlsplit (jadi '://' di query string tidak dianggap host); userinfo dan port dibuang.
+    same_site=True: selain itu, terima juga host dengan registered domain yang sama
+    (misal shop.example.co.uk untuk target www.example.co.uk)."""
+    if not url or not domain:
+        return False
     try:
-        host = (urlparse(url).netloc or "").lower()
-        d = (domain or "").strip().lower()
-        return host == d or host.endswith("." + d)
-    except Exception:
+        netloc = urlsplit(url).netloc
+    except ValueError:
         return False
+    return _scope(netloc.rpartition("@")[2].partition(":")[0].lower(), domain, same_site)
+
+
+@lru_cache(maxsize=1024)
+def _scope(host: str, domain: str, same_site: bool = False) -> bool:
+    # Di-cache per (host, domain), bukan per URL: banyak URL beda path tapi host-nya itu-itu saja,
+    # jadi strip/lower domain dan lookup registered_domain cuma jalan sekali per pasangan.
+    d = domain.strip().lower()
+    if host == d or host.endswith("." + d):
+        return True
+    return same_site and registered_domain(host) == registered_domain(d)
 
 
 def dedup_results(items: List[Dict[str, str]], key: str = "url") -> List[Dict[str, str]]:
     """Dedup item berdasarkan key (default url). Sekalian normalize URL."""
+    is_url = key == "url"
+    norm = normalize_url if is_url else (lambda x: x)
     seen = set()
     out = []
     for it in items:
-        val = it.get(key, "")
-        if key == "url":
-            val = normalize_url(val)
+        val = norm(it.get(key, ""))
+        if is_url:
             it["url"] = val
         if not val or val in seen:
             continue
@@ -71,11 +141,13 @@ def dedup_results(items: List[Dict[str, str]], key: str = "url") -> List[Dict[st
 
 # -------- Env loading & logging --------
 
+@lru_cache(maxsize=1)
 def load_cse_env_or_exit() -> Dict[str, str]:
     """
     Wajib:
     - baca .env: GOOGLE_API_KEY, GOOGLE_CSE_ID
     - kalau tidak ada, pesan jelas dan exit
+    Hasil di-cache per proses: .env cuma di-parse sekali.
     """
     if load_dotenv is not None:
         load_dotenv()
@@ -97,46 +169,145 @@ def load_cse_env_or_exit() -> Dict[str, str]:
 
 
 def setup_logger(log_path: str):
-    logging.basicConfig(
-        filename=log_path,
-        level=logging.INFO,
-        format="%(asctime)s | %(levelname)s | %(message)s",
-    )
+    """
+    Idempotent (cukup sekali per proses). Tulis ke file lewat QueueHandler + QueueListener:
+    logging.info() di jalur request cuma enqueue, file I/O dikerjakan thread listener.
+    """
+    if getattr(setup_logger, "_done", False):
+        return
+    setup_logger._done = True
+
+    file_handler = logging.FileHandler(log_path)
+    file_handler.setFormatter(logging.Formatter("%(asctime)s | %(levelname)s | %(message)s"))
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop)
+
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
     logging.info("Logger initialized (CSE)")
 
 
 # -------- Error classifier (buat kolom snippet_or_error rapi) --------
 
-def classify_cse_error(message: str) -> str:
-    m = (message or "").lower()
-
-    if "missing env" in m or "membutuhkan env" in m or "required" in m:
-        return "ERR_MISSING_ENV"
-    if "quota" in m or "daily limit" in m or "limit exceeded" in m:
-        return "ERR_QUOTA_EXCEEDED"
-    if "api key not valid" in m or "invalid key" in m or "bad api key" in m:
-        return "ERR_INVALID_KEY"
-    if "http 429" in m or "too many requests" in m or "rate limit" in m:
-        return "ERR_RATE_LIMIT"
-    if "timeout" in m:
-        return "ERR_TIMEOUT"
-
-    # 403 bisa invalid key / quota / access denied
-    if "http 403" in m or "forbidden" in m:
-        return "ERR_FORBIDDEN"
+# Urutan = prioritas (misal "HTTP 403: quota exceeded" -> QUOTA, bukan FORBIDDEN).
+# 403 bisa invalid key / quota / access denied, jadi FORBIDDEN paling akhir.
+_ERR_CODES = (
+    ("MISSING_ENV", "ERR_MISSING_ENV"),
+    ("QUOTA", "ERR_QUOTA_EXCEEDED"),
+    ("INVALID_KEY", "ERR_INVALID_KEY"),
+    ("RATE_LIMIT", "ERR_RATE_LIMIT"),
+    ("TIMEOUT", "ERR_TIMEOUT"),
+    ("FORBIDDEN", "ERR_FORBIDDEN"),
+)
+
+# Dibungkus lookahead (zero-width) supaya match boleh overlap:
+# "rate limit exceeded" harus tetap kena QUOTA ("limit exceeded"), bukan cuma RATE_LIMIT.
+_ERR_RE = re.compile(
+    r"(?=(?P<MISSING_ENV>missing env|membutuhkan env|required)"
+    r"|(?P<QUOTA>quota|daily limit|limit exceeded)"
+    r"|(?P<INVALID_KEY>api key not valid|invalid key|bad api key)"
+    r"|(?P<RATE_LIMIT>http 429|too many requests|rate limit)"
+    r"|(?P<TIMEOUT>timeout)"
+    r"|(?P<FORBIDDEN>http 403|forbidden))",
+    re.IGNORECASE,
+)
 
+
+def classify_cse_error(message: str) -> str:
+    # satu pass regex atas message; kalau beberapa grup cocok, ambil yang prioritasnya paling tinggi
+    found = {m.lastgroup for m in _ERR_RE.finditer(message or "")}
+    for group, code in _ERR_CODES:
+        if group in found:
+            return code
     return "ERR_UNKNOWN"
 
 
 # -------- Rate limit & retry policy --------
 
-def rate_limit_sleep(sleep_min: float, sleep_max: float, jitter: bool = True):
+_LAST_CALL_AT: Optional[float] = None  # time.monotonic() dari panggilan rate_limit_sleep terakhir
+
+
+def rate_limit_sleep(sleep_min: float, sleep_max: float, jitter: bool = True, skip_if_idle: bool = False):
+    """
+    Delay antar request. skip_if_idle=True (opt-in): kalau request terakhir sudah lebih dari
+    sleep_max detik yang lalu, jeda sudah "terbayar" oleh idle time, jadi tidak perlu sleep lagi.
+    """
+    global _LAST_CALL_AT
     if sleep_max < sleep_min:
         sleep_max = sleep_min
-    if jitter:
-        time.sleep(random.uniform(sleep_min, sleep_max))
-    else:
-        time.sleep(sleep_min)
+    now = time.monotonic()
+    idle = _LAST_CALL_AT is not None and (now - _LAST_CALL_AT) > sleep_max
+    if not (skip_if_idle and idle):
+        if jitter:
+            time.sleep(random.uniform(sleep_min, sleep_max))
+        else:
+            time.sleep(sleep_min)
+    _LAST_CALL_AT = time.monotonic()
+
+
+class TokenBucket:
+    """
+    Rate limiter async global: rata-rata `rate` request/detik, boleh burst sampai `burst`
+    request sekaligus. Dipakai bareng oleh semua worker, jadi N query bisa jalan paralel
+    tapi total QPS tetap di bawah batas quota (tanpa idle fix per query).
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None  # dibuat di event loop yang aktif
+
+    @classmethod
+    def from_sleep(cls, sleep_min: float, sleep_max: float, burst: int = 1) -> "TokenBucket":
+        """rate = 1 / rata-rata jeda (sleep_min..sleep_max); jeda 0 = tanpa batas."""
+        avg = (sleep_min + max(sleep_min, sleep_max)) / 2
+        return cls(1.0 / avg if avg > 0 else 0.0, burst)
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def backoff_delay(attempt: int, base: float = 0.1, cap: float = 20.0, retry_after: Optional[float] = None) -> float:
+    """
+    "Full jitter" backoff: uniform(0, min(cap, base * 2**attempt)).
+    Kalau server kirim Retry-After, tunggu minimal selama itu -- tapi tetap dibatasi `cap`
+    (Retry-After yang kelewat besar jangan sampai bikin run macet).
+    """
+    sleep_s = random.uniform(0.0, min(cap, base * (2 ** attempt)))
+    if retry_after is not None:
+        sleep_s = max(sleep_s, min(retry_after, cap))
+    return sleep_s
+
+
+def _retry_after_s(headers) -> Optional[float]:
+    # Retry-After bisa berupa detik atau HTTP-date; yang format tanggal diabaikan,
+    # begitu juga nilai non-finite ("inf", "nan") yang bikin time.sleep error / asyncio.sleep selamanya
+    raw = (headers or {}).get("Retry-After")
+    if not raw:
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        return None
+    return max(0.0, value) if math.isfinite(value) else None
 
 
 def should_retry(status_code: Optional[int], err_text: str) -> bool:
@@ -157,24 +328,127 @@ def log_query_summary(domain: str, detected_type: str, dork: str, status: str, g
 
 # -------- Core CSE call (support paging) --------
 
+CSE_URL = "https://www.googleapis.com/customsearch/v1"
+CSE_MAX_START = 91  # start max biasanya 91 untuk 100 results
+
+# Session bersama untuk semua query CSE: koneksi TLS ke googleapis.com dipakai ulang (keep-alive).
+# Retry ditangani sendiri di cse_search_paged, jadi max_retries=0. Jangan di-.close() oleh caller.
+def build_session(pool_connections: int = 4, pool_maxsize: int = 32) -> requests.Session:
+    """requests.Session dengan connection pool + keep-alive untuk googleapis.com."""
+    sess = requests.Session()
+    sess.mount("https://", HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0))
+    sess.headers.update({"Accept-Encoding": "gzip", "User-Agent": "thesis-dork-cse/1.0"})
+    return sess
+
+
+_SESSION = build_session()
+
+# Kalau httpx ada, default-nya pakai httpx.Client (HTTP/2: semua page lewat satu koneksi multiplexed).
+# Dibuat lazy saat pertama dipakai; sama seperti _SESSION, jangan di-.close() oleh caller.
+# Accept-Encoding diisi otomatis oleh httpx sesuai decoder yang terpasang (gzip/deflate, br kalau ada brotli).
+_HTTPX: Optional["httpx.Client"] = None
+
+_NET_ERRORS: Tuple[type, ...] = (requests.Timeout, requests.ConnectionError)
+if httpx is not None:
+    _NET_ERRORS += (httpx.TimeoutException, httpx.TransportError)
+
+
+def _default_client() -> Union[requests.Session, "httpx.Client"]:
+    global _HTTPX
+    if httpx is None:
+        return _SESSION
+    if _HTTPX is None:
+        _HTTPX = httpx.Client(
+            http2=_HTTP2,
+            timeout=20,
+            headers={"User-Agent": "thesis-dork-cse/1.0"},
+            limits=httpx.Limits(max_keepalive_connections=8),
+        )
+    return _HTTPX
+
+
+def _decode_payload(resp) -> Dict:
+    try:
+        # orjson (Rust) jauh lebih cepat dari json stdlib; hasilnya dict/list biasa
+        if orjson is not None:
+            return orjson.loads(resp.content)
+        return resp.json()
+    except Exception:
+        return {"_raw": resp.text[:500]}
+
+
+def _http_error_message(status: int, data) -> str:
+    # ambil message error kalau ada
+    if isinstance(data, dict):
+        msg = (data.get("error", {}) or {}).get("message", "") or str(data)
+    else:
+        msg = str(data)
+    return f"HTTP {status}: {msg}"
+
+
+def _page_items(data) -> List[Tuple[str, str, str]]:
+    items = (data.get("items") or []) if isinstance(data, dict) else []
+    return [
+        ((it.get("title") or "").strip(), (it.get("link") or "").strip(), (it.get("snippet") or "").strip())
+        for it in items
+    ]
+
+
+def _total_hits(data) -> Optional[int]:
+    """searchInformation.totalResults (string di response CSE) -> int; None kalau tidak ada."""
+    info = data.get("searchInformation") if isinstance(data, dict) else None
+    try:
+        return int(info["totalResults"])
+    except (TypeError, KeyError, ValueError):
+        return None
+
+
+def _page_plan(total_results: int) -> List[Tuple[int, int]]:
+    """List (start, num) per page: start=1,11,21,... sampai total_results / CSE_MAX_START."""
+    plan = []
+    start = 1
+    remaining = total_results
+    while remaining > 0 and start <= CSE_MAX_START:
+        num = min(10, remaining)
+        plan.append((start, num))
+        remaining -= num
+        start += 10
+    return plan
+
+
+# -------- Query cache (hemat quota: query yang sama tidak dikirim ulang) --------
+
+CACHE_DIR = ".cse_cache"
+CACHE_TTL = 86400  # detik (1 hari)
+_QUERY_CACHE = None
+
+
+def _query_cache():
+    # lazy: direktori cache baru dibuat saat CSE benar-benar dipakai. Tanpa diskcache: cache nonaktif.
+    global _QUERY_CACHE
+    if Cache is None:
+        return None
+    if _QUERY_CACHE is None:
+        _QUERY_CACHE = Cache(CACHE_DIR)
+    return _QUERY_CACHE
+
+
+def _cache_key(query: str, cse_id: str, total_results: int) -> str:
+    return hashlib.sha1(f"{cse_id}|{total_results}|{query}".encode("utf-8")).hexdigest()
+
+
 def _cse_http_call(
-    session: requests.Session,
+    session: Union[requests.Session, "httpx.Client"],
     query: str,
     api_key: str,
     cse_id: str,
     start: int,
     num: int,
     timeout: int
-) -> Tuple[int, Dict]:
-    url = "https://www.googleapis.com/customsearch/v1"
+) -> Tuple[int, Dict, Optional[float]]:
     params = {"key": api_key, "cx": cse_id, "q": query, "start": start, "num": num}
-    resp = session.get(url, params=params, timeout=timeout)
-    status = resp.status_code
-    try:
-        data = resp.json()
-    except Exception:
-        data = {"_raw": resp.text[:500]}
-    return status, data
+    resp = session.get(CSE_URL, params=params, timeout=timeout)
+    return resp.status_code, _decode_payload(resp), _retry_after_s(resp.headers)
 
 
 def cse_search_paged(
@@ -184,18 +458,35 @@ def cse_search_paged(
     total_results: int = 10,
     timeout: int = 20,
     retries: int = 3,
-    backoff_base: float = 1.6,
+    backoff_base: float = 0.1,
     sleep_min: float = 1.0,
     sleep_max: float = 2.0,
-    session: Optional[requests.Session] = None,
+    session: Optional[Union[requests.Session, "httpx.Client"]] = None,
+    backoff_cap: float = 20.0,
+    skip_idle_sleep: bool = False,
+    use_cache: bool = True,
+    acquire: Optional[Callable[[], None]] = None,
 ) -> List[Dict[str, str]]:
     """
     Ambil SERP via CSE JSON API, support total_results > 10 (paging start=1,11,21,...).
     Return list item: {rank,title,url,snippet}
+
+    acquire: callback (blocking) yang dipanggil sebelum tiap HTTP attempt, menggantikan
+    rate_limit_sleep -- dipakai fallback async untuk ambil token dari TokenBucket.
+
+    Tanpa `session`, pakai client shared (httpx HTTP/2 kalau ada, else _SESSION) — jangan di-close.
+    use_cache=True: hasil sukses disimpan di CACHE_DIR selama CACHE_TTL (butuh diskcache).
     """
-    sess = session or requests.Session()
+    sess = session or _default_client()
     total_results = max(1, int(total_results))
 
+    cache = _query_cache() if use_cache else None
+    key = _cache_key(query, cse_id, total_results)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+
     results: List[Dict[str, str]] = []
     start = 1
     rank = 1
@@ -207,12 +498,16 @@ def cse_search_paged(
 
         last_err = None
         t0 = time.time()
+        items: List[Tuple[str, str, str]] = []
 
         for attempt in range(1, retries + 1):
             try:
-                rate_limit_sleep(sleep_min, sleep_max, jitter=True)
+                if acquire is not None:
+                    acquire()
+                else:
+                    rate_limit_sleep(sleep_min, sleep_max, jitter=True, skip_if_idle=skip_idle_sleep)
 
-                status, data = _cse_http_call(
+                status, data, retry_after = _cse_http_call(
                     session=sess,
                     query=query,
                     api_key=api_key,
@@ -223,27 +518,17 @@ def cse_search_paged(
                 )
 
                 if status != 200:
-                    # ambil message error kalau ada
-                    msg = ""
-                    if isinstance(data, dict):
-                        msg = (data.get("error", {}) or {}).get("message", "") or str(data)
-                    else:
-                        msg = str(data)
-
-                    err = f"HTTP {status}: {msg}"
+                    err = _http_error_message(status, data)
                     if should_retry(status, err) and attempt < retries:
-                        sleep_s = (backoff_base ** attempt) + random.uniform(0.0, 0.7)
+                        sleep_s = backoff_delay(attempt, backoff_base, backoff_cap, retry_after)
                         logging.warning(f"CSE retry {attempt}/{retries} in {sleep_s:.2f}s | {err} | q={query}")
                         time.sleep(sleep_s)
                         continue
 
                     raise RuntimeError(err)
 
-                items = (data.get("items") or []) if isinstance(data, dict) else []
-                for it in items:
-                    title = (it.get("title") or "").strip()
-                    link = (it.get("link") or "").strip()
-                    snippet = (it.get("snippet") or "").strip()
+                items = _page_items(data)
+                for title, link, snippet in items:
                     results.append({"rank": rank, "title": title, "url": link, "snippet": snippet})
                     rank += 1
 
@@ -255,11 +540,11 @@ def cse_search_paged(
                 logging.info(f"CSE page ok | start={start} | got={len(items)} | ms={elapsed_ms} | q={query}")
                 break
 
-            except (requests.Timeout, requests.ConnectionError) as e:
+            except _NET_ERRORS as e:
                 last_err = str(e)
                 if attempt >= retries:
                     raise RuntimeError(f"Timeout/ConnError: {last_err}")
-                sleep_s = (backoff_base ** attempt) + random.uniform(0.0, 0.7)
+                sleep_s = backoff_delay(attempt, backoff_base, backoff_cap)
                 logging.warning(f"CSE net retry {attempt}/{retries} in {sleep_s:.2f}s | err={last_err} | q={query}")
                 time.sleep(sleep_s)
 
@@ -268,6 +553,10 @@ def cse_search_paged(
                 # kalau tidak perlu retry / sudah habis
                 raise RuntimeError(last_err)
 
+        # page kosong / tidak penuh = hasil sudah habis, page berikutnya cuma buang quota
+        if len(items) < num:
+            break
+
         # next page
         start += 10
 
@@ -276,9 +565,212 @@ def cse_search_paged(
             break
 
         # safety: jika start terlalu besar (CSE punya limit hasil), stop
-        if start > 91:  # start max biasanya 91 untuk 100 results
+        if start > CSE_MAX_START:
             break
 
     # post-process: normalize + dedup
     results = dedup_results(results, key="url")
+    if cache is not None:
+        cache.set(key, results, expire=CACHE_TTL)
     return results
+
+
+# -------- Async CSE call (semua page paralel) --------
+
+HTTPX_AVAILABLE = httpx is not None
+
+
+def new_async_client(timeout: int = 20, max_connections: Optional[int] = None) -> "httpx.AsyncClient":
+    """AsyncClient untuk dipakai bersama oleh banyak query (jangan satu client per query)."""
+    if httpx is None:
+        raise RuntimeError("CSE async membutuhkan paket httpx (pip install httpx).")
+    return httpx.AsyncClient(
+        http2=_HTTP2,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=10),
+    )
+
+
+async def _cse_fetch_page_async(
+    client: "httpx.AsyncClient",
+    query: str,
+    api_key: str,
+    cse_id: str,
+    start: int,
+    num: int,
+    retries: int,
+    backoff_base: float,
+    backoff_cap: float,
+    sleep_min: float,
+    sleep_max: float,
+    bucket: Optional[TokenBucket] = None,
+) -> Tuple[int, List[Tuple[str, str, str]], Optional[int]]:
+    """
+    Satu page CSE dengan retry/backoff yang sama seperti versi sync.
+    Return (start, items, total_hits) -- total_hits dari searchInformation.totalResults.
+    Kalau `bucket` diberikan, jeda random per request diganti bucket.acquire().
+    """
+    params = {"key": api_key, "cx": cse_id, "q": query, "start": start, "num": num}
+    t0 = time.time()
+
+    for attempt in range(1, retries + 1):
+        try:
+            if bucket is not None:
+                await bucket.acquire()
+            else:
+                await asyncio.sleep(random.uniform(sleep_min, max(sleep_min, sleep_max)))
+
+            resp = await client.get(CSE_URL, params=params)
+            status, data = resp.status_code, _decode_payload(resp)
+
+            if status != 200:
+                err = _http_error_message(status, data)
+                if should_retry(status, err) and attempt < retries:
+                    sleep_s = backoff_delay(attempt, backoff_base, backoff_cap, _retry_after_s(resp.headers))
+                    logging.warning(f"CSE retry {attempt}/{retries} in {sleep_s:.2f}s | {err} | q={query}")
+                    await asyncio.sleep(sleep_s)
+                    continue
+
+                raise RuntimeError(err)
+
+            items = _page_items(data)
+            elapsed_ms = int((time.time() - t0) * 1000)
+            logging.info(f"CSE page ok | start={start} | got={len(items)} | ms={elapsed_ms} | q={query}")
+            return start, items, _total_hits(data)
+
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            last_err = str(e)
+            if attempt >= retries:
+                raise RuntimeError(f"Timeout/ConnError: {last_err}")
+            sleep_s = backoff_delay(attempt, backoff_base, backoff_cap)
+            logging.warning(f"CSE net retry {attempt}/{retries} in {sleep_s:.2f}s | err={last_err} | q={query}")
+            await asyncio.sleep(sleep_s)
+
+        except Exception as e:
+            raise RuntimeError(str(e))
+
+    return start, [], None
+
+
+async def cse_search_paged_async(
+    query: str,
+    api_key: str,
+    cse_id: str,
+    total_results: int = 10,
+    timeout: int = 20,
+    retries: int = 3,
+    backoff_base: float = 0.1,
+    sleep_min: float = 1.0,
+    sleep_max: float = 2.0,
+    client: Optional["httpx.AsyncClient"] = None,
+    backoff_cap: float = 20.0,
+    use_cache: bool = True,
+    session: Optional[requests.Session] = None,
+    bucket: Optional[TokenBucket] = None,
+) -> List[Dict[str, str]]:
+    """
+    Sama seperti cse_search_paged, tapi lewat satu httpx.AsyncClient: page 1 diambil dulu, lalu
+    page sisanya (start=11,21,...) dikirim bersamaan -- hanya kalau page 1 penuh dan
+    searchInformation.totalResults memang sampai ke start itu (hemat quota untuk query yang
+    hasilnya sedikit). Error fatal pertama membatalkan page lain. Urutan rank mengikuti start.
+    `session` hanya dipakai di fallback tanpa httpx (diteruskan ke cse_search_paged).
+    `bucket`: TokenBucket global; kalau ada, menggantikan jeda sleep_min..sleep_max per request.
+    """
+    total_results = max(1, int(total_results))
+
+    cache = _query_cache() if use_cache else None
+    key = _cache_key(query, cse_id, total_results)
+    if cache is not None:
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+
+    if client is None and httpx is None:
+        acquire = None
+        if bucket is not None:
+            # token diambil per HTTP attempt (termasuk retry) dari dalam thread: acquire() jalan
+            # di event loop ini, thread-nya nunggu sampai token dapat
+            loop = asyncio.get_running_loop()
+
+            def acquire():
+                asyncio.run_coroutine_threadsafe(bucket.acquire(), loop).result()
+
+        # tanpa httpx: jalankan versi sync di thread supaya caller async tetap bisa concurrent
+        return await asyncio.to_thread(
+            cse_search_paged, query, api_key, cse_id, total_results=total_results, timeout=timeout,
+            retries=retries, backoff_base=backoff_base, sleep_min=sleep_min, sleep_max=sleep_max,
+            session=session, backoff_cap=backoff_cap, use_cache=use_cache, acquire=acquire,
+        )
+
+    own_client = client is None
+    cli = client or new_async_client(timeout)
+
+    def fetch(start: int, num: int):
+        return _cse_fetch_page_async(
+            cli, query, api_key, cse_id, start, num,
+            retries, backoff_base, backoff_cap, sleep_min, sleep_max, bucket,
+        )
+
+    try:
+        (first_start, first_num), *rest = _page_plan(total_results)
+        first = await fetch(first_start, first_num)
+        pages = [first]
+
+        _, first_items, hits = first
+        if len(first_items) >= first_num:
+            rest = [(s, n) for s, n in rest if hits is None or s <= hits]
+        else:
+            rest = []  # page 1 sudah tidak penuh: tidak ada page berikutnya
+
+        if rest:
+            tasks = [asyncio.ensure_future(fetch(s, n)) for s, n in rest]
+            try:
+                pages += await asyncio.gather(*tasks)
+            except BaseException:
+                # error fatal pertama (quota, 403, ...): page lain tidak usah ditunggu / di-retry
+                for t in tasks:
+                    t.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise
+    finally:
+        if own_client:
+            await cli.aclose()
+
+    results: List[Dict[str, str]] = []
+    rank = 1
+    for _, items, _ in sorted(pages, key=lambda p: p[0]):
+        if not items:
+            break  # sama seperti versi sync: page kosong = akhir hasil
+        for title, link, snippet in items:
+            results.append({"rank": rank, "title": title, "url": link, "snippet": snippet})
+            rank += 1
+
+    # post-process: normalize + dedup
+    results = dedup_results(results, key="url")
+    if cache is not None:
+        cache.set(key, results, expire=CACHE_TTL)
+    return results
+
+
+def cse_search_paged_concurrent(
+    query: str,
+    api_key: str,
+    cse_id: str,
+    total_results: int = 10,
+    timeout: int = 20,
+    retries: int = 3,
+    backoff_base: float = 0.1,
+    sleep_min: float = 1.0,
+    sleep_max: float = 2.0,
+    backoff_cap: float = 20.0,
+    use_cache: bool = True,
+) -> List[Dict[str, str]]:
+    """Shim sync untuk CLI: jalankan cse_search_paged_async via asyncio.run() (fallback ke versi sync tanpa httpx)."""
+    kwargs = dict(
+        query=query, api_key=api_key, cse_id=cse_id, total_results=total_results, timeout=timeout,
+        retries=retries, backoff_base=backoff_base, sleep_min=sleep_min, sleep_max=sleep_max,
+        backoff_cap=backoff_cap, use_cache=use_cache,
+    )
+    if httpx is None:
+        return cse_search_paged(**kwargs)
+    return asyncio.run(cse_search_paged_async(**kwargs))
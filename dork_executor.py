@@ -1,9 +1,13 @@
+import re
 import time
 import random
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlparse, parse_qs
 
+import requests
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
@@ -12,6 +16,11 @@ from selenium.webdriver.firefox.options import Options as FirefoxOptions
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+try:
+    from selectolax.parser import HTMLParser
+except Exception:
+    HTMLParser = None
+
 
 BLOCK_KEYWORDS = [
     "unusual traffic",
@@ -21,6 +30,60 @@ BLOCK_KEYWORDS = [
     "captcha"
 ]
 
+# satu regex (case-insensitive) untuk semua keyword: satu pass, tanpa copy .lower() dari page source
+_BLOCK_RE = re.compile("|".join(re.escape(k) for k in BLOCK_KEYWORDS), re.IGNORECASE)
+
+SERP_USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+)
+
+def new_serp_session() -> requests.Session:
+    """Session untuk SERP via HTTP (keep-alive ke google.com). requests.Session tidak thread-safe:
+    satu session per thread / per driver, jangan dibagi antar worker --parallel."""
+    s = requests.Session()
+    s.headers.update({"User-Agent": SERP_USER_AGENT, "Accept-Language": "en-US,en;q=0.9"})
+    return s
+
+
+# default kalau caller tidak kasih session: satu session per thread
+_LOCAL = threading.local()
+
+
+def _thread_session() -> requests.Session:
+    s = getattr(_LOCAL, "session", None)
+    if s is None:
+        s = _LOCAL.session = new_serp_session()
+    return s
+
+
+# sinyal block yang murah dicek lewat WebDriver (tanpa serialisasi DOM penuh)
+BLOCK_SELECTOR = "#captcha-form, form[action*='/sorry']"
+
+
+# Ambil semua hasil SERP dalam satu execute_script (satu round-trip WebDriver, bukan ~3 per hasil).
+# Block tanpa h3/a dilewati dan tidak dihitung ke max_results, sama seperti loop find_element sebelumnya.
+_SERP_JS = """
+return Array.from(document.querySelectorAll('div.g'))
+  .map(b => ({b: b, h: b.querySelector('h3'), a: b.querySelector('a')}))
+  .filter(x => x.h && x.a)
+  .slice(0, arguments[0])
+  .map(x => ({title: x.h.innerText || '', url: x.a.href || '', snippet: x.b.innerText || ''}));
+"""
+
+
+class BlockedError(RuntimeError):
+    """Google menampilkan halaman block / CAPTCHA."""
+
+
+class SerpParseError(RuntimeError):
+    """Halaman SERP tidak bisa di-parse (consent page, halaman JS-only, markup berubah)."""
+
+
+# tanda SERP normal yang memang tanpa hasil: container hasil ada, atau notice "no results"
+SERP_CONTAINER_SELECTOR = "#search, #res"
+_NO_RESULTS_RE = re.compile(r"did not match any documents|tidak cocok dengan dokumen apa pun", re.IGNORECASE)
+
 
 def setup_logger(log_path: str):
     logging.basicConfig(
@@ -55,13 +118,10 @@ def build_driver(browser="chrome", headless=True, wait=15):
 
 
 def is_blocked(page_source: str) -> bool:
-    src = page_source.lower()
-    return any(k in src for k in BLOCK_KEYWORDS)
+    return _BLOCK_RE.search(page_source) is not None
 
 
 def google_search(driver, query, max_results=10, wait=15):
-    results = []
-
     driver.get("https://www.google.com")
     time.sleep(2)
 
@@ -74,32 +134,89 @@ def google_search(driver, query, max_results=10, wait=15):
         EC.presence_of_element_located((By.ID, "search"))
     )
 
-    if is_blocked(driver.page_source):
-        raise RuntimeError("Google blocked / CAPTCHA detected")
+    # cek ringan dulu: redirect ke /sorry/ atau form captcha
+    if "/sorry" in driver.current_url or driver.find_elements(By.CSS_SELECTOR, BLOCK_SELECTOR):
+        raise BlockedError("Google blocked / CAPTCHA detected")
+
+    results = [
+        {"rank": rank, "title": r["title"], "url": r["url"], "snippet": r["snippet"]}
+        for rank, r in enumerate(driver.execute_script(_SERP_JS, max_results) or [], 1)
+    ]
+
+    # ambigu (tidak ada hasil sama sekali): baru scan page_source sebagai second-tier check
+    if not results and is_blocked(driver.page_source):
+        raise BlockedError("Google blocked / CAPTCHA detected")
+
+    return results
+
+
+def _serp_href(href: str) -> str:
+    # SERP versi non-JS kadang kasih link redirect "/url?q=<target>&..."
+    if href.startswith("/url?"):
+        return (parse_qs(urlparse(href).query).get("q") or [""])[0]
+    return href
+
 
-    blocks = driver.find_elements(By.CSS_SELECTOR, "div.g")
-    rank = 1
+def google_search_http(session, query, max_results=10, timeout=15):
+    """
+    SERP lewat HTTP GET + selectolax (tanpa browser). Raise BlockedError kalau kena block/CAPTCHA,
+    requests.HTTPError untuk status selain 200 (error network: requests.RequestException lainnya).
+    Tanpa div.g: return [] kalau halamannya SERP kosong yang sah (container #search/#res atau notice
+    "did not match any documents"), selain itu raise SerpParseError.
+    """
+    if HTMLParser is None:
+        raise RuntimeError("google_search_http membutuhkan selectolax (pip install selectolax)")
 
-    for b in blocks:
-        if rank > max_results:
+    resp = (session or _thread_session()).get(
+        "https://www.google.com/search",
+        params={"q": query, "num": max_results},
+        timeout=timeout,
+    )
+    if resp.status_code == 429 or "/sorry/" in resp.url or is_blocked(resp.text):
+        raise BlockedError("Google blocked / CAPTCHA detected")
+    if resp.status_code != 200:
+        raise requests.HTTPError(f"HTTP SERP status {resp.status_code}", response=resp)
+
+    tree = HTMLParser(resp.text)
+    results = []
+    for b in tree.css("div.g"):
+        if len(results) >= max_results:
             break
-        try:
-            title = b.find_element(By.TAG_NAME, "h3").text
-            url = b.find_element(By.TAG_NAME, "a").get_attribute("href")
-            snippet = b.text
-            results.append({
-                "rank": rank,
-                "title": title,
-                "url": url,
-                "snippet": snippet
-            })
-            rank += 1
-        except Exception:
+        h3 = b.css_first("h3")
+        a = b.css_first("a[href]")
+        if h3 is None or a is None:
             continue
-
+        results.append({
+            "rank": len(results) + 1,
+            "title": h3.text(strip=True),
+            "url": _serp_href(a.attributes.get("href") or ""),
+            "snippet": b.text(separator=" ", strip=True)
+        })
+
+    if not results and tree.css_first(SERP_CONTAINER_SELECTOR) is None and not _NO_RESULTS_RE.search(resp.text):
+        raise SerpParseError("HTTP SERP tidak bisa di-parse")
     return results
 
 
+def google_search_auto(driver, query, max_results=10, wait=15, session=None):
+    """
+    Coba google_search_http dulu; pakai Selenium (driver) kalau selectolax tidak ada, kalau diblok,
+    kalau request gagal / status bukan 200, atau kalau halamannya tidak bisa di-parse (consent page,
+    halaman JS-only, markup berubah). SERP kosong yang sah (0 hasil, kasus umum untuk dork
+    site-scoped) langsung return [] tanpa buka browser.
+    """
+    if HTMLParser is not None:
+        try:
+            return google_search_http(session, query, max_results=max_results, timeout=wait)
+        except SerpParseError:
+            logging.debug(f"HTTP SERP tidak bisa di-parse, fallback ke Selenium | q={query}")
+        except BlockedError:
+            logging.warning(f"HTTP SERP blocked, fallback ke Selenium | q={query}")
+        except requests.RequestException as e:
+            logging.warning(f"HTTP SERP gagal ({e}), fallback ke Selenium | q={query}")
+    return google_search(driver, query, max_results=max_results, wait=wait)
+
+
 def save_block_screenshot(driver):
     Path("screenshots").mkdir(exist_ok=True)
     name = f"screenshots/blocked_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
@@ -7,9 +7,13 @@ No CSV input support; simple and short.
 
 # import required libraries
 from __future__ import annotations # buat memastikan kompatibilitas tipe data untuk Python yang old ver 
-import argparse, csv, re # Untuk membuat CLI yang UI friendly , csv dan re untuk regex
+import argparse, csv, itertools, os, re, sys # Untuk membuat CLI yang UI friendly , csv dan re untuk regex
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from functools import lru_cache
 from pathlib import Path # cara untuk mengelola path file dan direktori
-from typing import List, Tuple  # Untuk memberikan petunjuk tipe data (type hinting) biar kode lebih jelas
+from typing import Dict, Iterator, List, Tuple, Union  # Untuk memberikan petunjuk tipe data (type hinting) biar kode lebih jelas
 
 # Regex -> fastest way buat mencocokkan pola teks.
 # Definisikan beberapa pola untuk mendeteksi jenis data PII.
@@ -20,60 +24,156 @@ PATTERNS = {
     "date": re.compile(r"^(?:\d{2}[-/]\d{2}[-/](?:19|20)\d{2})$"),
 }
 
+# Semua pola di atas digabung jadi satu regex (named group per tipe), jadi cukup satu kali match.
+# Alternatif pertama = format khusus "Nama|TanggalLahir" (ada '|' dan 4 digit tahun di mana saja),
+# sisanya ikut urutan PATTERNS, jadi prioritas deteksi tetap sama. m.lastgroup = nama tipe.
+_DETECT_RE = re.compile(
+    r"(?P<name_dob>(?s:(?=.*\|)(?=.*\d{4}).*))|"
+    + "|".join(f"(?P<{k}>{p.pattern[1:-1]})" for k, p in PATTERNS.items())
+)
+
 def detect_type(s: str) -> str:
     v = s.strip() # Menghapus spasi / karakter kosong di awal dan akhir string
-    # quick name|dob detection
 
-    if "|" in v and re.search(r"\d{4}", v): # Quick detection untuk format khusus "Nama|TanggalLahir"
-        return "name_dob"
-    
-    # Loop melalui setiap pola regex yang udah dibuat di atas
-    for k, p in PATTERNS.items():
-        if p.match(v):
-            return k  # Jika string cocok dengan salah satu pola
-                      # Kembalikan nama polanya (misal: "email", "nik")
+    # Satu kali match untuk semua pola (termasuk "Nama|TanggalLahir") yang udah dibuat di atas
+    m = _DETECT_RE.fullmatch(v)
+    if m:
+        return m.lastgroup  # Kembalikan nama polanya (misal: "email", "nik")
     
     # Kalo input data tidak cocok dengan regex di atas, kita coba deteksi umum
     if v.isdigit():      # Jika string hanya berisi angka
         return "numeric"
     
-    if any(c.isalpha() for c in v) and any(c.isdigit() for c in v): # Jika mengandung huruf DAN angka
+    if v.isascii() and v.isalnum(): # Hanya [A-Za-z0-9]: cek di level C, tanpa loop per karakter
+        return "unknown" if v.isalpha() else "alphanumeric"
+
+    if any(c.isalpha() for c in v) and any(c.isdigit() for c in v): # Jika mengandung huruf DAN angka (ada spasi/simbol)
         return "alphanumeric"
 
     return "unknown" # Jika semua deteksi gagal, tandai sebagai "unknown"
 
-def read_lines(path: Path) -> List[str]:
-    if not path.exists(): # Cek dulu apakah filenya ada , klo gada, return list kosong
-        return []
+def iter_lines(path: Path) -> Iterator[str]:
+    if not path.exists(): # Cek dulu apakah filenya ada , klo gada, generator langsung selesai
+        return
     
-    # Buka file dengan encoding utf-8 (standar umum)
-    with path.open(encoding="utf-8") as f:  
-        # Ini  "list comprehension", cara cepat untuk membuat list.
-        # Artinya: untuk setiap baris (ln) di file, ambil baris itu, hapus spasi,
-        # dan masukkan ke list HANYA JIKA baris itu tidak kosong dan tidak diawali '#'
-        
-        return [ln.strip() for ln in f if ln.strip() and not ln.strip().startswith("#")]
+    # Buka file dengan encoding utf-8 (standar umum), buffer 1 MiB biar read syscall lebih sedikit
+    with path.open(encoding="utf-8", buffering=1 << 20) as f:  
+        # Ini generator: baris di-yield satu per satu (file tidak pernah dimuat penuh ke RAM).
+        yield from _clean_lines(f)
+
+def _clean_lines(lines) -> Iterator[str]:
+    # Baris di-strip, lalu di-yield HANYA JIKA tidak kosong, tidak diawali '#',
+    # dan belum pernah muncul sebelumnya (dedup on-the-fly pakai set)
+    seen = set()
+    for ln in lines:
+        s = ln.strip()
+        if s and not s.startswith("#") and s not in seen:
+            seen.add(s)
+            yield s
+
+def read_lines(path: Union[str, Path]) -> List[str]:
+    # Versi list dari iter_lines, untuk data yang dipakai berulang (misal daftar domain).
+    # Isi file diambil sekali jalan (satu f.read()) lalu dipecah per baris di level bytes,
+    # jadi gak ada overhead baca per baris lewat text IO. Hasilnya sama persis dengan iter_lines.
+    # Terima str atau Path; file yang tidak ada dicek lewat open() saja (tanpa exists()/stat() terpisah).
+    try:
+        with open(os.fspath(path), "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return []
+    # bytes.splitlines cuma pecah di \n, \r\n, \r (sama seperti mode teks), decode tetap utf-8 strict
+    return list(_clean_lines(ln.decode("utf-8") for ln in data.splitlines()))
 
-def gen_site_dorks(domain: str, value: str, detected: str) -> List[str]:
-    # Dork dasar untuk membatasi pencarian hanya pada satu situs web
-    base = f"site:{domain}"
+# Tipe yang punya template dork sendiri; tipe lain (date, alphanumeric, unknown) pakai "_default"
+TEMPLATE_TYPES = ("email", "phone", "nik", "numeric", "name_dob", "_default")
+
+def _build_templates(domain: str, detected: str) -> List[str]:
+    # Template format string per (domain, tipe): {v} = value, {name}/{dob} = hasil split name|dob
+    # Kurung kurawal di domain di-escape supaya tidak dianggap placeholder oleh str.format
+    base = "site:" + domain.replace("{", "{{").replace("}", "}}")
 
     # Logic untuk membuat dork yang lebih spesifik berdasarkan tipe data
 
     if detected == "email":                                             # Untuk email, cari email persis atau email yang ada di dalam teks halaman
-        return [f'{base} "{value}"', f'{base} intext:"{value}"']
+        return [f'{base} "{{v}}"', f'{base} intext:"{{v}}"']
 
     if detected == "phone":                                             # Untuk no. telp, cari juga di dalam file spreadsheet (xls)    
-        return [f'{base} "{value}"', f'{base} intext:"{value}"', f'{base} filetype:xls intext:"{value}"']
+        return [f'{base} "{{v}}"', f'{base} intext:"{{v}}"', f'{base} filetype:xls intext:"{{v}}"']
     
     if detected in ("nik","numeric"):                                   # Untuk NIK atau angka, cari juga di dalam file spreadsheet (xls)
-        return [f'{base} "{value}"', f'{base} intext:"{value}"', f'{base} filetype:xls intext:"{value}"']
+        return [f'{base} "{{v}}"', f'{base} intext:"{{v}}"', f'{base} filetype:xls intext:"{{v}}"']
 
-    if detected == "name_dob":                                           # Untuk format name|dob, pisahkan dulu
-        name, dob = (value.split("|",1)+[""])[:2]
-        return [f'{base} "{name}" "{dob}"', f'{base} intext:"{name}" filetype:pdf']
+    if detected == "name_dob":                                           # Untuk format name|dob, nama & dob diisi terpisah
+        return [f'{base} "{{name}}" "{{dob}}"', f'{base} intext:"{{name}}" filetype:pdf']
     # Cari kombinasi nama dan tanggal lahir, atau nama di dalam file PDF (sering untuk CV atau dokumen resmi)
-    return [f'{base} "{value}"', f'{base} intext:"{value}"']
+    return [f'{base} "{{v}}"', f'{base} intext:"{{v}}"']
+
+def build_template_table(domains: List[str]) -> Dict[str, Dict[str, List[str]]]:
+    # Dibangun sekali sebelum loop: {domain: {tipe: [template, ...]}}
+    return {d: {t: _build_templates(d, t) for t in TEMPLATE_TYPES} for d in domains}
+
+def split_name_dob(value: str) -> Tuple[str, str]:
+    name, dob = (value.split("|",1)+[""])[:2]
+    return name, dob
+
+def _escape_braces(s: str) -> str:
+    return s.replace("{", "{{").replace("}", "}}")
+
+@lru_cache(maxsize=4096)
+def gen_dork_templates(value: str, detected: str) -> Tuple[str, ...]:
+    # Kebalikan dari build_template_table: value diisi sekali, {domain} dibiarkan sebagai placeholder.
+    # Per domain tinggal t.format(domain=domain). Kurung kurawal di value di-escape untuk format kedua itu.
+    name, dob = split_name_dob(value) if detected == "name_dob" else ("", "")
+    return tuple(
+        t.format(v=_escape_braces(value), name=_escape_braces(name), dob=_escape_braces(dob))
+        for t in _build_templates("{domain}", detected)
+    )
+
+# Satu baris dork. namedtuple: irit memori seperti tuple (tanpa dict per row), tapi bisa row.domain, row.dork.
+# Tetap tuple biasa, jadi bisa langsung di-unpack atau ditulis lewat csv writerows.
+Row = namedtuple("Row", "domain value detected_type dork")
+
+def build_rows(templates: Tuple[str, ...], domains: List[str], value: str, detected: str) -> List[Row]:
+    # Cartesian domain x template untuk satu value, langsung jadi list flat Row(domain, value, detected_type, dork).
+    # Satu list comprehension: loop dalamnya jalan di bytecode sempit, tanpa append/yield per row.
+    return [Row(d, value, detected, t.format(domain=d)) for d in domains for t in templates]
+
+def gen_site_dorks(domain: str, value: str, detected: str) -> List[str]:
+    # Dork dasar untuk membatasi pencarian hanya pada satu situs web
+    name, dob = split_name_dob(value) if detected == "name_dob" else ("", "")
+    return [t.format(v=value, name=name, dob=dob) for t in _build_templates(domain, detected)]
+
+def _process(value: str, domains: List[str], templates: Dict[str, Dict[str, List[str]]]) -> Tuple[List[Tuple[str,str,str,str]], str]:
+    # Semua kerja untuk satu value PII: return (rows untuk CSV, teks output layar)
+    detected = detect_type(value) #detect tipe PII
+    kind = detected if detected in TEMPLATE_TYPES else "_default"
+    # name|dob cukup di-split sekali per value (sama untuk semua domain)
+    name, dob = split_name_dob(value) if detected == "name_dob" else ("", "")
+
+    rows = []
+    lines = [] # output layar ditampung dulu, lalu ditulis sekali per value (print per baris = lock stdout per call)
+    # Loop melalui setiap domain untuk value ini
+    for domain in domains:
+        dorks = [t.format(v=value, name=name, dob=dob) for t in templates[domain][kind]] # Buat dork-nya
+        # " || ".join(dorks) menggabungkan semua dork menjadi satu string dipisahkan oleh " || "
+        rows.append((domain, value, detected, " || ".join(dorks)))
+
+        # Cetak informasi ke layar agar pengguna tahu proses berjalan
+        lines.append(f"READ INPUT: {value} (detected_type={detected}) @ {domain}")
+        lines.extend(f"  {i}) {q}" for i, q in enumerate(dorks, 1))
+    lines.append("")  # spacer per input
+    return rows, "\n".join(lines) + "\n"
+
+# --workers > 1: domains + templates dikirim (pickle) sekali per worker lewat initializer, bukan per task
+WORKER_CHUNKSIZE = 256
+_WORKER_CTX = None
+
+def _init_worker(domains: List[str], templates: Dict[str, Dict[str, List[str]]]):
+    global _WORKER_CTX
+    _WORKER_CTX = (domains, templates)
+
+def _process_in_worker(value: str):
+    return _process(value, *_WORKER_CTX)
 
 def main():
     """Fungsi utama yang akan dieksekusi saat script dijalankan."""
@@ -83,16 +183,19 @@ def main():
     ap.add_argument("-d","--domains-file", default="domains.txt", help="Domains list (.txt), one domain per line.")
     ap.add_argument("--dry-run", action="store_true", help="Do not execute queries; just print/save templates.")
     ap.add_argument("--output", "-o", default="", help="Optional CSV output path to save results.")
+    ap.add_argument("--workers", type=int, default=1, help="Worker processes for dork generation (1 = no multiprocessing).")
     args = ap.parse_args() # Memproses argumen yang diberikan pengguna
 
-    # Membaca file input PII dan domain menggunakan fungsi read_lines
-    inputs = read_lines(Path(args.input))
+    # Input PII di-stream (iter_lines); domain dibaca penuh karena dipakai ulang di tiap value
+    inputs = iter_lines(Path(args.input))
     domains = read_lines(Path(args.domains_file))
 
     # Validasi: Pastikan kita punya data untuk diproses
-    if not inputs:
+    first = next(inputs, None)
+    if first is None:
         print(f"No PII inputs found in {args.input}.")
         return
+    inputs = itertools.chain([first], inputs)
     if not domains:
         print(f"No domains found in {args.domains_file}. Provide at least one domain.")
         return
@@ -100,31 +203,36 @@ def main():
     # Siapkan list kosong untuk menampung semua hasil
     rows: List[Tuple[str,str,str,str]] = []  # domain, value, detected, dorks_joined
 
-    # Loop 1st utama: iterasi melalui setiap data PII
-    for value in inputs:
-        detected = detect_type(value) #detect tipe PII
-
-        # Loop 2 loop melalui setiap domain untuk setiap data PII skrg
-        for domain in domains:
-            dorks = gen_site_dorks(domain, value, detected) # Buat dork-nya
-            # Tambahkan hasilnya ke list 'rows'
-            # " || ".join(dorks) menggabungkan semua dork menjadi satu string dipisahkan oleh " || "
-            rows.append((domain, value, detected, " || ".join(dorks)))
-
-            # Cetak informasi ke layar agar pengguna tahu proses berjalan
-            print(f"READ INPUT: {value} (detected_type={detected}) @ {domain}")
-            for i, q in enumerate(dorks, 1):
-                print(f"  {i}) {q}")
-        print()  # spacer per input
+    # Template dork per domain dibangun sekali, loop di bawah tinggal isi value
+    templates = build_template_table(domains)
+
+    # Loop utama: iterasi melalui setiap data PII (paralel antar proses kalau --workers > 1)
+    # map() menjaga urutan input, jadi output layar & CSV sama persis dengan mode serial
+    if args.workers > 1:
+        pool_cm = ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(domains, templates))
+    else:
+        pool_cm = nullcontext()
+
+    with pool_cm as pool:
+        if pool is not None:
+            # map() submit semua item sekaligus, jadi input dikirim per slice (WORKER_CHUNKSIZE per worker):
+            # stream iter_lines tetap dibaca bertahap, bukan disedot habis jadi future dulu
+            step = WORKER_CHUNKSIZE * args.workers
+            chunks = iter(lambda: list(itertools.islice(inputs, step)), [])
+            results = (r for chunk in chunks for r in pool.map(_process_in_worker, chunk, chunksize=WORKER_CHUNKSIZE))
+        else:
+            results = (_process(value, domains, templates) for value in inputs)
+
+        for value_rows, text in results:
+            rows.extend(value_rows) # Tambahkan hasilnya ke list 'rows'
+            sys.stdout.write(text)
 
     # Kalo pengguna memberikan argumen --output, simpan hasilnya ke file CSV
     if args.output:
         outp = Path(args.output)
-        with outp.open("w", newline="", encoding="utf-8") as f:
-            w = csv.writer(f)
-            w.writerow(["domain","value","detected_type","dorks"])
-            for r in rows:
-                w.writerow(r)
+        # buffer 1 MiB: header + semua baris ditulis lewat satu writerows, syscall write jauh lebih sedikit
+        with outp.open("w", newline="", encoding="utf-8", buffering=1 << 20) as f:
+            csv.writer(f).writerows([("domain","value","detected_type","dorks"), *rows])
         print(f"Saved {len(rows)} rows to {args.output}")
 
     if args.dry_run:
@@ -5,25 +5,32 @@ Import fungsi utama dari loaderev.py supaya modul tetap modular.
 """
 from pathlib import Path
 import os
+import sys
 import argparse
+import asyncio
 import csv
+import queue
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from typing import List, Tuple
 
 # import fungsi dari loaderev.py — pastikan loaderev.py ada di folder yang sama
-from loaderev import read_lines, detect_type, gen_site_dorks
+from loaderev import read_lines, detect_type, gen_dork_templates, build_rows
 
 # fungsi tambahan untuk validasi domain
 import re
 DOMAIN_RE = re.compile(r"^(?:[a-zA-Z0-9-]+\.)+[a-zA-Z]{2,63}$")
 
-from cse_executor import (
-    load_cse_env_or_exit,
-    setup_logger as setup_logger_cse,
-    cse_search_paged,
-    is_domain_scoped,
-    classify_cse_error,
-    log_query_summary,
-)
+# buffer tulis file CSV (default Python cuma 8 KiB -> syscall write tiap beberapa baris)
+CSV_BUFFER = 1 << 20
+# --output ditulis per batch lewat writerows (loop di level C), bukan writerow per baris
+CSV_BATCH = 1000
+
+# cse_executor (requests/httpx/diskcache) dan dork_executor (selenium) di-import di dalam
+# branch engine-nya saja, jadi --dry-run / --output tidak ikut bayar waktu import modul itu
 
 
 def validate_domain(domain: str) -> bool:
@@ -31,22 +38,225 @@ def validate_domain(domain: str) -> bool:
     d = domain.strip().lower()
     return bool(DOMAIN_RE.match(d))
 
+def validate_domains(domains: List[str]) -> Tuple[List[str], List[str]]:
+    """Versi batch validate_domain: return (valid_domains, invalid_domains), urutan input dipertahankan."""
+    _m = DOMAIN_RE.match
+    pairs = [(d, bool(_m(d.strip().lower()))) for d in domains]
+    return [d for d, ok in pairs if ok], [d for d, ok in pairs if not ok]
+
+def scope_pattern(domain: str) -> "re.Pattern":
+    """Regex 'URL ini ada di domain (atau subdomain) ini?' — dicompile sekali per domain."""
+    d = re.escape(domain.strip())
+    return re.compile(rf"^https?://(?:[^/?#]*[.@])?{d}(?::\d+)?(?:[/?#]|$)", re.IGNORECASE)
+
+def iter_rows(to_process, domains, allowed=None, verbose=False, quiet=False, emit=True):
+    """
+    Generate Row(domain, value, detected_type, dork) satu per satu, tanpa menampung semuanya di RAM.
+    Dork tetap dicetak ke layar seperti sebelumnya (kecuali quiet), ditampung per value lalu
+    ditulis sekali lewat sys.stdout.write (print per baris = lock + encode stdout per call).
+    allowed: frozenset tipe dari --filter (None = semua tipe).
+    emit=False: mode preview, dork cuma dicetak; tidak ada Row yang dibuat / di-yield.
+    """
+    write = sys.stdout.write
+    # domain & detected_type berulang di tiap row: di-intern supaya semua row pegang objek yang sama
+    # (dan cek `in allowed` kena jalur identity-compare). value & dork tidak (kardinalitas tinggi).
+    intern = sys.intern
+    domains = [intern(d) for d in domains]
+    for value in to_process:
+        detected = intern(detect_type(value))
+
+        if allowed is not None and detected not in allowed:
+            if verbose:
+                print(f"[SKIP] {value} (detected={detected}) not in filter {sorted(allowed)}")
+            continue
+
+        if quiet and not emit:  # tidak ada yang dicetak maupun di-yield
+            continue
+
+        # bagian dork yang bergantung value dibuat sekali; semua domain x template jadi satu list flat
+        templates = gen_dork_templates(value, detected)
+        if emit:
+            rows = build_rows(templates, domains, value, detected)
+            dorks = [r.dork for r in rows] if not quiet else ()
+        else:
+            dorks = [t.format(domain=d) for d in domains for t in templates]
+
+        if not quiet:
+            k = len(templates)
+            buf = []
+            for j, domain in enumerate(domains):
+                buf.append(f"READ INPUT: {value} (detected_type={detected}) @ {domain}\n")
+                buf.extend(f"  {i}) {q}\n" for i, q in enumerate(dorks[j * k:(j + 1) * k], 1))
+            buf.append("\n")
+            write("".join(buf))
+
+        # ✅ INI YANG PENTING: flatten
+        if emit:
+            yield from rows
+
+
+async def run_cse(work, writer, api_key, cse_id, args, scope_re=None) -> bool:
+    """
+    Eksekusi dork via CSE secara concurrent: args.concurrency worker menarik row dari `work`
+    bergantian, semua pakai satu httpx.AsyncClient. CSV cuma ditulis oleh satu consumer
+    (lewat asyncio.Queue) supaya csv.writer tetap single-writer.
+    scope_re: {domain: scope_pattern(domain)}; domain di luar dict pakai is_domain_scoped.
+    Return True kalau berhenti karena quota CSE habis.
+    """
+    from cse_executor import (
+        cse_search_paged_async,
+        new_async_client,
+        build_session,
+        TokenBucket,
+        HTTPX_AVAILABLE,
+        is_domain_scoped,
+        classify_cse_error,
+    )
+
+    scope_re = scope_re or {}
+    rows_iter = iter(work)
+    out_q: asyncio.Queue = asyncio.Queue()
+    quota_hit = asyncio.Event()
+    # satu pool koneksi untuk semua query di run ini (TLS handshake cuma di awal)
+    pool_size = max(32, args.concurrency)
+    if HTTPX_AVAILABLE:
+        client, session = new_async_client(args.timeout, max_connections=pool_size), None
+    else:
+        client, session = None, build_session(pool_connections=pool_size, pool_maxsize=pool_size)
+    # satu token bucket global: QPS rata-rata = 1/jeda rata-rata, burst = jumlah worker
+    bucket = TokenBucket.from_sleep(args.sleep_min, args.sleep_max, burst=args.concurrency)
+
+    async def consume():
+        while True:
+            batch = await out_q.get()
+            if batch is None:
+                return
+            writer.writerows(batch)
+
+    async def worker():
+        for row in rows_iter:
+            if quota_hit.is_set():
+                return
+            try:
+                results = await cse_search_paged_async(
+                    query=row.dork,
+                    api_key=api_key,
+                    cse_id=cse_id,
+                    total_results=args.max_results,   # boleh > 10, paging otomatis
+                    timeout=args.timeout,
+                    retries=args.retries,
+                    sleep_min=args.sleep_min,
+                    sleep_max=args.sleep_max,
+                    client=client,
+                    session=session,
+                    bucket=bucket,
+                    use_cache=not args.no_cache,
+                )
+                # guard domain-scoped
+                domain = row.domain
+                pat = scope_re.get(domain)
+                await out_q.put([
+                    [*row, r["rank"], r["title"], r["url"], r["snippet"]]
+                    for r in results
+                    if (pat.match(r["url"]) if pat is not None else is_domain_scoped(r["url"], domain))
+                ])
+
+            except Exception as e:
+                code = classify_cse_error(str(e))
+                await out_q.put([[*row, -1, "", "", f"{code}: {e}"]])
+                # STOP kalau quota habis: batalkan query lain yang sedang jalan (biar gak bakar request)
+                if code == "ERR_QUOTA_EXCEEDED":
+                    quota_hit.set()
+                    for t in workers:
+                        if t is not asyncio.current_task():
+                            t.cancel()
+                    return
+
+    consumer = asyncio.create_task(consume())
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, args.concurrency))]
+    try:
+        await asyncio.gather(*workers, return_exceptions=True)
+    finally:
+        if client is not None:
+            await client.aclose()
+        if session is not None:
+            session.close()
+        await out_q.put(None)
+        await consumer
+    return quota_hit.is_set()
+
+
+def run_selenium(rows, writer, drivers, args):
+    """
+    Eksekusi dork via Selenium paralel: satu thread per WebDriver di `drivers`.
+    Tiap worker pinjam (driver, session) dari pool (queue.Queue) lalu mengembalikannya; tiap driver
+    punya requests.Session sendiri untuk SERP via HTTP (Session tidak thread-safe). Hasil ditulis
+    oleh thread pemanggil sesuai urutan rows, jadi csv.writer tetap single-writer.
+    Paling banyak 2 x len(drivers) row yang di-submit sekaligus, jadi `rows` (generator) tetap
+    streaming. Error pertama (biasanya block/CAPTCHA) menghentikan query berikutnya.
+    """
+    from dork_executor import google_search_auto, new_serp_session, save_block_screenshot
+
+    sessions = [new_serp_session() for _ in drivers]
+    pool: queue.Queue = queue.Queue()
+    for pair in zip(drivers, sessions):
+        pool.put(pair)
+    stop = threading.Event()
+
+    def worker(row):
+        if stop.is_set():
+            return []
+        drv, sess = pair = pool.get()
+        try:
+            results = google_search_auto(drv, row.dork, max_results=args.max_results, wait=args.wait, session=sess)
+            return [[*row, r["rank"], r["title"], r["url"], r["snippet"]] for r in results]
+        except Exception as e:
+            stop.set()
+            shot = save_block_screenshot(drv)
+            return [[*row, -1, "", "", f"ERROR: {e} | screenshot={shot}"]]
+        finally:
+            pool.put(pair)
+
+    window = 2 * len(drivers)
+    pending: deque = deque()
+    try:
+        with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+            for row in rows:  # <-- rows, bukan dorks
+                if stop.is_set():
+                    break
+                pending.append(executor.submit(worker, row))
+                if len(pending) >= window:
+                    # tulis sesuai urutan: tunggu future paling tua sebelum submit row berikutnya
+                    writer.writerows(pending.popleft().result())
+            while pending:
+                writer.writerows(pending.popleft().result())
+    finally:
+        for s in sessions:
+            s.close()
+
+
 def main():
     ap = argparse.ArgumentParser(description="Domain-scoped loader (txt-only).")
     ap.add_argument("--engine",default="",choices=["selenium", "cse"],help="Pilih executor: selenium (browser) atau cse (Google Custom Search JSON API).")
     ap.add_argument("--retries", type=int, default=3, help="Retry untuk CSE.")
     ap.add_argument("--timeout", type=int, default=20, help="HTTP timeout untuk CSE (detik).")
+    ap.add_argument("--no-cache", action="store_true", help="Jangan pakai cache hasil query CSE (.cse_cache).")
+    ap.add_argument("--concurrency", type=int, default=8, help="Jumlah query CSE yang jalan bersamaan.")
 
     ap.add_argument("-i", "--input", default="input_pii.txt",
                     help="File input PII (.txt), satu baris per data.")
     ap.add_argument("-d", "--domains-file", default="domains.txt",
                     help="File daftar domain (.txt), satu domain per baris.")
+    ap.add_argument("--strict-domains", action="store_true",
+                    help="Berhenti (exit code 2) kalau ada domain yang tidak valid.")
     ap.add_argument("--dry-run", action="store_true",
                     help="Mode simulasi (tidak menjalankan query, hanya tampilkan).")
     ap.add_argument("--output", "-o", default="",
                     help="Path file CSV opsional untuk menyimpan hasil.")
     ap.add_argument("--verbose", action="store_true",
                     help="Cetak info tambahan seperti absolute paths dan hitungan.")
+    ap.add_argument("--quiet", action="store_true",
+                    help="Jangan cetak dork yang di-generate ke layar.")
     ap.add_argument("--limit", type=int, default=0,
                     help="Proses maksimal N input PII (0 = semua).")
     ap.add_argument("--filter", dest="type_filter", default="",
@@ -57,6 +267,8 @@ def main():
                 help="Browser untuk Selenium.")
     ap.add_argument("--headless", action="store_true",
                 help="Jalankan browser tanpa GUI.")
+    ap.add_argument("--parallel", type=int, default=1,
+                help="Jumlah browser Selenium yang jalan paralel.")
     ap.add_argument("--max-results", type=int, default=5,
                 help="Ambil maksimal N hasil per query.")
     ap.add_argument("--exec-limit", type=int, default=0,
@@ -65,6 +277,8 @@ def main():
                 help="Timeout/wait Selenium (detik).")
     ap.add_argument("--results", default="results.csv",
                 help="CSV output hasil eksekusi Selenium.")
+    ap.add_argument("--csv-buffer", type=int, default=CSV_BUFFER,
+                help="Ukuran buffer tulis file CSV (byte).")
     ap.add_argument("--log", default="executor.log",
                 help="Path log executor Selenium.")
     ap.add_argument("--sleep-min", type=float, default=1.2,
@@ -87,8 +301,8 @@ def main():
         print("[VERBOSE] Domains path:", domains_path.resolve())
 
     # gunakan fungsi read_lines dari loaderev.py
-    inputs = read_lines(input_path)
-    domains = read_lines(domains_path)
+    inputs = read_lines(os.fspath(input_path))
+    domains = read_lines(os.fspath(domains_path))
 
     if not inputs:
         print(f"[!] Tidak ada data PII di {args.input}.")
@@ -98,72 +312,90 @@ def main():
         return
 
     # validate domains
-    valid_domains = []
-    invalid_domains = []
-    for d in domains:
-        if validate_domain(d):
-            valid_domains.append(d)
-        else:
-            invalid_domains.append(d)
+    valid_domains, invalid_domains = validate_domains(domains)
     if invalid_domains:
-        print("[!] Peringatan: beberapa domain tampak tidak valid dan akan tetap diproses, tapi cek kembali:")
+        if args.strict_domains:
+            print("[!] Domain tidak valid (--strict-domains), proses dihentikan:")
+        else:
+            print("[!] Peringatan: beberapa domain tampak tidak valid dan akan dilewati, cek kembali:")
         for d in invalid_domains:
             print("   -", d)
+        if args.strict_domains:
+            sys.exit(2)
+    if not valid_domains:
+        print(f"[!] Tidak ada domain valid di {args.domains_file}.")
+        return
 
     to_process = inputs if args.limit <= 0 else inputs[:args.limit]
     if args.verbose:
         print(f"[VERBOSE] Total PII read: {len(inputs)}; to process: {len(to_process)}")
         print(f"[VERBOSE] Total domains read: {len(domains)}; valid: {len(valid_domains)}")
 
-    rows = []
-    for value in to_process:
-        detected = detect_type(value)
-
-        if args.type_filter:
-            allowed = [x.strip() for x in args.type_filter.split(",") if x.strip()]
-            if detected not in allowed:
-                if args.verbose:
-                    print(f"[SKIP] {value} (detected={detected}) not in filter {allowed}")
-                continue
-
-        for domain in domains:
-            dorks = gen_site_dorks(domain, value, detected)
-
-            # ✅ INI YANG PENTING: flatten
-            for q in dorks:
-                rows.append({
-                    "domain": domain,
-                    "value": value,
-                    "detected_type": detected,
-                    "dork": q
-                })
-            
-            print(f"READ INPUT: {value} (detected_type={detected}) @ {domain}")
-            for i, q in enumerate(dorks, 1):
-                print(f"  {i}) {q}")
-        print()
+    # --filter di-parse sekali di sini, bukan per value
+    allowed = frozenset(sys.intern(x.strip()) for x in args.type_filter.split(",") if x.strip()) if args.type_filter else None
+
+    # hanya domain valid yang di-generate (domain invalid gak ikut dicetak / ditulis / dieksekusi).
+    # rows cuma dibutuhkan untuk --output atau engine; kalau cuma preview, cetak saja lalu selesai
+    need_rows = bool(args.output) or (not args.dry_run and bool(engine))
+    if not need_rows:
+        for _ in iter_rows(to_process, valid_domains, allowed, args.verbose, args.quiet, emit=False):
+            pass
+        if args.dry_run:
+            print("DRY-RUN MODE: tidak ada query yang dijalankan ke Google.")
+        return
 
-    if args.output:
-        outp = Path(args.output)
-        with outp.open("w", newline="", encoding="utf-8") as f:
+    rows = iter_rows(to_process, valid_domains, allowed, args.verbose, args.quiet)
+
+    # --output ditulis sambil jalan (streaming), bukan dari list rows di akhir
+    saved = 0
+
+    def save_rows(it, w):
+        nonlocal saved
+        batch = []
+        try:
+            for r in it:
+                batch.append(r)
+                if len(batch) >= CSV_BATCH:
+                    w.writerows(batch)
+                    saved += len(batch)
+                    batch.clear()
+                yield r
+        finally:
+            # sisa batch tetap ditulis, juga kalau generator ditutup lebih awal (error / Ctrl+C)
+            w.writerows(batch)
+            saved += len(batch)
+
+    with ExitStack() as stack:
+        if args.output:
+            outp = Path(args.output)
+            f = stack.enter_context(outp.open("w", newline="", encoding="utf-8", buffering=args.csv_buffer))
             w = csv.writer(f)
             w.writerow(["domain", "value", "detected_type", "dorks"])
-            for r in rows:
-                w.writerow([r["domain"], r["value"], r["detected_type"], r["dork"]])
-        print(f"[OK] Disimpan: {len(rows)} baris ke file {args.output}")
+            rows = save_rows(rows, w)
+            stack.callback(rows.close)  # ditutup sebelum file, jadi batch terakhir sempat di-flush
+
+        if not args.dry_run and engine:
+            run_engines(rows, args, valid_domains)
+
+        # sisa rows (dry-run, --exec-limit, quota habis) tetap di-generate supaya print & --output lengkap
+        for _ in rows:
+            pass
+
+    if args.output:
+        print(f"[OK] Disimpan: {saved} baris ke file {args.output}")
 
     if args.dry_run:
         print("DRY-RUN MODE: tidak ada query yang dijalankan ke Google.")
-        return
-    
-    print("[DEBUG] rows count:", len(rows))
-    print("[DEBUG] sample row:", rows[0] if rows else None)
 
+
+def run_engines(rows, args, valid_domains=()):
+    """Jalankan rows (iterable Row(domain, value, detected_type, dork)) lewat engine yang dipilih."""
     # =========================
     # ENGINE CSE (Jalur C)
     # =========================
     if args.engine == "cse":
         print("[EXEC] Starting CSE (Google Custom Search JSON API) executor...")
+        from cse_executor import load_cse_env_or_exit, setup_logger as setup_logger_cse
 
         # wajib .env
         env = load_cse_env_or_exit()
@@ -172,92 +404,47 @@ def main():
         api_key = env["GOOGLE_API_KEY"]
         cse_id = env["GOOGLE_CSE_ID"]
 
-        with open(args.results, "w", newline="", encoding="utf-8") as f:
+        with open(args.results, "w", newline="", encoding="utf-8", buffering=args.csv_buffer) as f:
             writer = csv.writer(f)
             writer.writerow(["domain","value","detected_type","dork","rank","title","url","snippet_or_error"])
 
-            work = rows if args.exec_limit <= 0 else rows[:args.exec_limit]
-            for row in work:
-                domain = row["domain"]
-                value = row["value"]
-                detected_type = row["detected_type"]
-                dork = row["dork"]
-
-                try:
-                    results = cse_search_paged(
-                        query=dork,
-                        api_key=api_key,
-                        cse_id=cse_id,
-                        total_results=args.max_results,   # boleh > 10, paging otomatis
-                        timeout=args.timeout,
-                        retries=args.retries,
-                        sleep_min=args.sleep_min,
-                        sleep_max=args.sleep_max,
-                    )
-
-                    for r in results:
-                        url = r["url"]
-                        # guard domain-scoped
-                        if not is_domain_scoped(url, domain):
-                            continue
-
-                        writer.writerow([
-                            domain, value, detected_type, dork,
-                            r["rank"], r["title"], url, r["snippet"]
-                        ])
-
-                except Exception as e:
-                    code = classify_cse_error(str(e))
-                    writer.writerow([
-                        domain, value, detected_type, dork,
-                        -1, "", "", f"{code}: {e}"
-                    ])
-                    # STOP kalau quota habis (biar gak bakar request lain)
-                    if code == "ERR_QUOTA_EXCEEDED":
-                        print("[!] Quota CSE harian habis. Stop supaya tidak buang request.")
-                        return
+            work = rows if args.exec_limit <= 0 else itertools.islice(rows, args.exec_limit)
+            scope_re = {d: scope_pattern(d) for d in valid_domains}
+            if asyncio.run(run_cse(work, writer, api_key, cse_id, args, scope_re)):
+                print("[!] Quota CSE harian habis. Stop supaya tidak buang request.")
+                return
 
         return
 
 
-    if args.execute:
-        from dork_executor import (
-            build_driver,
-            google_search,
-            setup_logger,
-            save_block_screenshot
-        )
-        
-        print("[EXEC] Starting Selenium executor...")
-        setup_logger(args.log)
-        driver = build_driver(
-            browser=args.browser,
-            headless=args.headless,
-            wait=args.wait
-        )
-
-    with open(args.results, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
-        writer.writerow(["domain","value","detected_type","dork","rank","title","url","snippet_or_error"])
-
-        for row in rows:  # <-- rows, bukan dorks
-            query = row["dork"]
-            try:
-                results = google_search(driver, query, max_results=args.max_results, wait=args.wait)
-                for r in results:
-                    writer.writerow([
-                        row["domain"], row["value"], row["detected_type"], query,
-                        r["rank"], r["title"], r["url"], r["snippet"]
-                    ])
-            except Exception as e:
-                shot = save_block_screenshot(driver)
-                writer.writerow([
-                    row["domain"], row["value"], row["detected_type"], query,
-                    -1, "", "", f"ERROR: {e} | screenshot={shot}"
-                ])
-                break
+    if not args.execute:
+        print("[!] Engine selenium butuh --execute untuk menjalankan query.")
+        return
 
-    driver.quit()
+    from dork_executor import (
+        build_driver,
+        setup_logger,
+    )
+
+    print("[EXEC] Starting Selenium executor...")
+    setup_logger(args.log)
+    drivers = []
+    try:
+        for _ in range(max(1, args.parallel)):
+            drivers.append(build_driver(
+                browser=args.browser,
+                headless=args.headless,
+                wait=args.wait
+            ))
+
+        with open(args.results, "w", newline="", encoding="utf-8", buffering=args.csv_buffer) as f:
+            writer = csv.writer(f)
+            writer.writerow(["domain","value","detected_type","dork","rank","title","url","snippet_or_error"])
+            run_selenium(rows, writer, drivers, args)
+    finally:
+        # driver selalu ditutup, juga kalau build_driver / query gagal di tengah jalan
+        for driver in drivers:
+            driver.quit()
 
 # pastikan main() dipanggil ketika file ini dieksekusi langsung
 if __name__ == "__main__":